@@ -1,15 +1,28 @@
 #!/usr/bin/env python3
 import argparse
-import csv
+import hashlib
+import json
 import logging
+import multiprocessing
+import os
+import re
+import shutil
+import threading
 import zipfile
-from datetime import datetime, timezone
-from io import BytesIO, TextIOWrapper
-
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from io import StringIO
+from operator import itemgetter
+from tempfile import TemporaryFile
+from typing import Optional
+
+import numpy as np
+import pandas as pd
 import requests
 import yaml
-from bs4 import BeautifulSoup
-from influxdb_client import InfluxDBClient, Point, WritePrecision
+from influxdb_client import InfluxDBClient, WriteOptions, WritePrecision
+from requests.adapters import HTTPAdapter
 
 ###############################################################################
 # Logging Configuration
@@ -27,6 +40,21 @@ BASE_URL = (
     "https://opendata.dwd.de/climate_environment/CDC/observations_germany/climate"
 )
 
+MONTH_KEYS = [
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+]
+
 PERIOD_STRINGS = [
     "1961-1990",
     "1971-2000",
@@ -60,6 +88,34 @@ NOW_URLS = {
     "temperature": TEN_MINUTE_DATA_URL["temperature"] + "/now/",
 }
 
+# Measurement recording the historical zip files whose data is fully stored
+LOADED_ZIPS_MEASUREMENT = "loaded_hist_zips"
+
+# Cached DWD index listings, revalidated with conditional requests
+INDEX_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "dwd-influx"
+)
+
+# Number of zip files fetched and processed concurrently in historical mode
+DOWNLOAD_WORKERS = 8
+
+# Number of worker processes for the independent fetch jobs of a run mode
+JOB_PROCESSES = 4
+
+# Number of text files inside a zip that are decompressed and parsed concurrently
+MEMBER_WORKERS = 4
+
+# Serializes writes to InfluxDB when zip files are processed concurrently
+_influx_write_lock = threading.Lock()
+
+# Batching options for the InfluxDB write API (flush_interval in milliseconds)
+INFLUX_WRITE_OPTIONS = WriteOptions(batch_size=5000, flush_interval=10_000)
+
+# Characters that must be escaped in line protocol tag keys/values and field keys
+_LINE_PROTOCOL_ESCAPES = str.maketrans(
+    {"\\": "\\\\", ",": r"\,", "=": r"\=", " ": r"\ ", "\n": r"\n"}
+)
+
 
 ###############################################################################
 # Helper Functions
@@ -90,12 +146,25 @@ def load_config(config_path: str) -> dict:
     return config
 
 
-def download_file(url: str) -> bytes:
+def create_session() -> requests.Session:
+    """
+    Creates a requests session with a connection pool large enough to be shared
+    by all download workers, so TCP/TLS connections to DWD are reused.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def download_file(url: str, session: Optional[requests.Session] = None) -> bytes:
     """
     Downloads the file from the given URL and returns the raw content as bytes.
+    If a session is given, its pooled connections are used.
     """
     logger.info("Downloading file from URL: %s", url)
-    r = requests.get(url, timeout=10)
+    r = (session or requests).get(url, timeout=10)
     try:
         r.raise_for_status()
     except Exception as e:
@@ -105,6 +174,37 @@ def download_file(url: str) -> bytes:
     return r.content
 
 
+def download_to_tempfile(url: str, session: Optional[requests.Session] = None):
+    """
+    Streams the file from the given URL into an anonymous temporary file and
+    returns it rewound to the start, so the response is never buffered in
+    memory. A real file is used rather than a SpooledTemporaryFile, which
+    zipfile can only read on Python 3.11 and later.
+    """
+    logger.info("Downloading file from URL: %s", url)
+    with (session or requests).get(url, timeout=10, stream=True) as r:
+        try:
+            r.raise_for_status()
+        except Exception as e:
+            logger.error("Error downloading %s: %s", url, e)
+            raise
+
+        tmp = TemporaryFile()
+        r.raw.decode_content = True
+        shutil.copyfileobj(r.raw, tmp)
+
+    logger.info("Downloaded %s (%d bytes)", url, tmp.tell())
+    tmp.seek(0)
+    return tmp
+
+
+def _records(df: pd.DataFrame) -> list:
+    """
+    Convert a DataFrame to a list of dicts, with missing values as None.
+    """
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
 def parse_multi_annual_means(content: str):
     """
     Parse multi-annual means text data (either precipitation or temperature).
@@ -121,233 +221,414 @@ def parse_multi_annual_means(content: str):
     }
     """
     logger.info("Parsing multi-annual means data")
-    lines = content.splitlines()
-    results = []
-    for line in lines:
-        line = line.strip()
-        # Skip empty lines or the header
-        if not line or line.startswith("Stations_id"):
-            continue
-
-        # Basic splitting by semicolon, then strip
-        parts = [p.strip() for p in line.split(";")]
-        # Make sure we handle the correct columns
-        # Example indexing:
-        # 0: station_id
-        # 1: Bezugszeitraum
-        # 2: Datenquelle
-        # 3..15: Jan..Dez, and 16: Jahr
-        try:
-            station_id = parts[0].zfill(5)
-            ref_period = parts[1]
-            jan_val = float(parts[3].replace(",", "."))
-            feb_val = float(parts[4].replace(",", "."))
-            mar_val = float(parts[5].replace(",", "."))
-            apr_val = float(parts[6].replace(",", "."))
-            may_val = float(parts[7].replace(",", "."))
-            jun_val = float(parts[8].replace(",", "."))
-            jul_val = float(parts[9].replace(",", "."))
-            aug_val = float(parts[10].replace(",", "."))
-            sep_val = float(parts[11].replace(",", "."))
-            oct_val = float(parts[12].replace(",", "."))
-            nov_val = float(parts[13].replace(",", "."))
-            dec_val = float(parts[14].replace(",", "."))
-            year_val = float(parts[15].replace(",", ".")) if parts[15] else None
-
-            results.append(
-                {
-                    "station_id": station_id,
-                    "reference_period": ref_period,
-                    "Jan": jan_val,
-                    "Feb": feb_val,
-                    "Mar": mar_val,
-                    "Apr": apr_val,
-                    "May": may_val,
-                    "Jun": jun_val,
-                    "Jul": jul_val,
-                    "Aug": aug_val,
-                    "Sep": sep_val,
-                    "Oct": oct_val,
-                    "Nov": nov_val,
-                    "Dec": dec_val,
-                    "Year": year_val,
-                }
-            )
-        except (IndexError, ValueError) as e:
-            logger.warning("Skipping malformed line: %s; Error: %s", line, e)
-            continue
+    # Convert the decimal commas once for the whole file, then let pandas'
+    # C parser split the lines and convert the numbers.
+    # Column layout:
+    # 0: station_id
+    # 1: Bezugszeitraum
+    # 2: Datenquelle
+    # 3..14: Jan..Dez, and 15: Jahr
+    df = pd.read_csv(
+        StringIO(content.replace(",", ".")),
+        sep=";",
+        header=0,
+        usecols=range(16),
+        names=["station_id", "reference_period", "source", *MONTH_KEYS, "Year"],
+        dtype={"station_id": str, "reference_period": str, "source": str},
+        skipinitialspace=True,
+    )
+    values = df[MONTH_KEYS + ["Year"]].apply(pd.to_numeric, errors="coerce")
+    df[MONTH_KEYS + ["Year"]] = values
+    df["station_id"] = df["station_id"].str.strip().str.zfill(5)
+    df["reference_period"] = df["reference_period"].str.strip()
+
+    malformed = (
+        df["station_id"].isna()
+        | df["reference_period"].isna()
+        | values[MONTH_KEYS].isna().any(axis=1)
+    )
+    skipped = int(malformed.sum())
+    if skipped:
+        # Log only a few examples, then a single summary
+        for _, row in df[malformed].head(5).iterrows():
+            logger.debug("Skipping malformed line: %s", row.to_dict())
+        logger.warning("Skipped %d malformed lines in multi-annual means", skipped)
+
+    results = _records(df.loc[~malformed].drop(columns="source"))
     logger.info("Parsed %d records from multi-annual means data", len(results))
 
     return results
 
 
-def parse_10min_precip(csv_content: str):
+def _read_10min_csv(csv_file, columns: dict) -> pd.DataFrame:
+    """
+    Read a 10-min product file into a DataFrame using pandas' C parser.
+    `csv_file` may be a binary file object, e.g. a member opened from the zip,
+    which is decoded while parsing without materializing the text first.
+    `columns` maps the DWD column names to read onto the names used in the
+    result. Missing values (-999) become NaN and MESS_DATUM is parsed to
+    datetimes.
+
+    Malformed input is filtered in bulk rather than per row. With usecols, the
+    C parser keeps lines with extra fields and pads short lines with NaN, so
+    rows that have none of the value columns, as well as rows without a valid
+    station ID or timestamp, are dropped as malformed. Unparsable values become
+    NaN. A single summary of what was skipped is logged, naming the file.
+    """
+    df = pd.read_csv(
+        csv_file,
+        sep=";",
+        encoding="latin-1",
+        usecols=list(columns),
+        dtype={"STATIONS_ID": str, "MESS_DATUM": str},
+        skipinitialspace=True,
+    )
+    # MESS_DATUM is YYYYMMDDhhmm (12 digits); parse the whole column in one call
+    # with a pinned format instead of inferring it per element
+    df["MESS_DATUM"] = pd.to_datetime(
+        df["MESS_DATUM"], format="%Y%m%d%H%M", cache=True, errors="coerce"
+    )
+    df = df.rename(columns=columns)
+
+    value_columns = [c for c in df.columns if c not in ("station_id", "time")]
+    raw_values = df[value_columns]
+    # -999 is only turned into NaN below, so at this point a row whose values
+    # are all NaN was cut short or left them empty
+    malformed = raw_values.isna().all(axis=1)
+    malformed |= df["station_id"].isna() | df["time"].isna()
+
+    values = raw_values.apply(pd.to_numeric, errors="coerce")
+    bad_values = int((raw_values.notna() & values.isna()).to_numpy().sum())
+    df[value_columns] = values.mask(values == -999)
+
+    bad_rows = int(malformed.sum())
+    df = df[~malformed]
+
+    if bad_rows or bad_values:
+        logger.warning(
+            "Skipped %d malformed rows and %d unparsable values in %s",
+            bad_rows,
+            bad_values,
+            getattr(csv_file, "name", "10-minute data"),
+        )
+
+    df["station_id"] = df["station_id"].str.strip().str.zfill(5)
+    return df
+
+
+def _point_arrays(df: pd.DataFrame, field_columns: list) -> dict:
+    """
+    Convert a DataFrame with "station_id" and "time" columns to a dict of
+    parallel NumPy arrays: station IDs, datetime64 timestamps and one float
+    array per field, with missing values as NaN.
+    """
+    arrays = {
+        "station_id": df["station_id"].to_numpy(dtype=object),
+        "time": df["time"].to_numpy(dtype="datetime64[s]"),
+    }
+    for column in field_columns:
+        arrays[column] = df[column].to_numpy(dtype=np.float64)
+    return arrays
+
+
+def parse_10min_precip(csv_file):
     """
-    Parse 10-min precipitation data from a CSV chunk inside the zip.
+    Parse 10-min precipitation data from a CSV file object inside the zip.
     Example lines:
        STATIONS_ID;MESS_DATUM;QN;RWS_DAU_10;RWS_10;RWS_IND_10;eor
 
     We only need MESS_DATUM, RWS_10.
-    Return list of dicts, e.g.:
+    Return a dict of parallel arrays, e.g.:
     {
-      "station_id": ...,
-      "timestamp": datetime object,
-      "precip_10min": float or None
+      "station_id": array of str,
+      "time": array of datetime64,
+      "precip_10min": array of float
     }
     """
-    logger.info("Parsing 10-minute temperature data")
-    out = []
-    reader = csv.reader(csv_content.splitlines(), delimiter=";")
-    for row in reader:
-        if not row or row[0].startswith("STATIONS_ID"):
-            continue
-        try:
-            station_id = row[0].strip().zfill(5)
-            mess_datum = row[1].strip()  # e.g. "202001010000"
-            rws_10 = row[4].strip()
-
-            # Convert time
-            # MESS_DATUM is YYYYMMDDhhmm (12 digits)
-            dt = datetime.strptime(mess_datum, "%Y%m%d%H%M")
-
-            # Convert precipitation to float (check for -999, which is missing)
-            precip_val = float(rws_10) if rws_10 != "-999" else None
-
-            if precip_val is None:
-                continue
+    logger.info("Parsing 10-minute precipitation data")
+    df = _read_10min_csv(
+        csv_file,
+        {"STATIONS_ID": "station_id", "MESS_DATUM": "time", "RWS_10": "precip_10min"},
+    )
 
-            out.append(
-                {"station_id": station_id, "time": dt, "precip_10min": precip_val}
-            )
-        except (IndexError, ValueError) as e:
-            logger.warning("Skipping row in temperature data: %s; Error: %s", row, e)
-            continue
+    # Rows without a precipitation value carry no information
+    df = df.dropna(subset=["precip_10min"])
+    out = _point_arrays(df, ["precip_10min"])
 
-    logger.info("Parsed %d temperature records", len(out))
+    logger.info("Parsed %d precipitation records", len(df))
 
     return out
 
 
-def parse_10min_temp(csv_content: str):
+def parse_10min_temp(csv_file):
     """
-    Parse 10-min temperature/humidity data from CSV chunk inside zip.
+    Parse 10-min temperature/humidity data from CSV file object inside zip.
     Example lines:
        STATIONS_ID;MESS_DATUM;QN;PP_10;TT_10;TM5_10;RF_10;TD_10;eor
 
     We want TT_10 (temp) and RF_10 (rel humidity).
-    Return list of dicts, e.g.:
+    Return a dict of parallel arrays, e.g.:
     {
-      "station_id": ...,
-      "time": datetime,
-      "temperature_10min": float or None,
-      "humidity_10min": float or None
+      "station_id": array of str,
+      "time": array of datetime64,
+      "temperature_10min": array of float (NaN if missing),
+      "humidity_10min": array of float (NaN if missing)
     }
     """
-    out = []
-    reader = csv.reader(csv_content.splitlines(), delimiter=";")
-    for row in reader:
-        if not row or row[0].startswith("STATIONS_ID"):
-            continue
-        try:
-            station_id = row[0].strip().zfill(5)
-            mess_datum = row[1].strip()  # e.g. "202001010000"
-            tt_10 = row[4].strip()
-            rf_10 = row[6].strip()
+    df = _read_10min_csv(
+        csv_file,
+        {
+            "STATIONS_ID": "station_id",
+            "MESS_DATUM": "time",
+            "TT_10": "temperature_10min",
+            "RF_10": "humidity_10min",
+        },
+    )
 
-            dt = datetime.strptime(mess_datum, "%Y%m%d%H%M")
+    df = df.dropna(subset=["temperature_10min", "humidity_10min"], how="all")
 
-            temp_val = float(tt_10) if tt_10 != "-999" else None
-            rh_val = float(rf_10) if rf_10 != "-999" else None
+    return _point_arrays(df, ["temperature_10min", "humidity_10min"])
 
-            if temp_val is None and rh_val is None:
-                continue
 
-            out.append(
-                {
-                    "station_id": station_id,
-                    "time": dt,
-                    "temperature_10min": temp_val,
-                    "humidity_10min": rh_val,
-                }
-            )
-        except (IndexError, ValueError):
-            continue
+# Parser and measurement name per 10-minute data type
+DATA_TYPE_CFG = {
+    "precipitation": (parse_10min_precip, "precip_10min"),
+    "temperature": (parse_10min_temp, "temp_10min"),
+}
 
-    return out
+
+def _escape_key(value: str) -> str:
+    """
+    Escape a tag key, tag value or field key for InfluxDB line protocol.
+    """
+    return value.translate(_LINE_PROTOCOL_ESCAPES)
+
+
+def _format_field_value(value) -> str:
+    """
+    Format a field value for InfluxDB line protocol.
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return f"{value}i"
+    if isinstance(value, float):
+        return repr(value)
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def build_station_tags(station_map: dict) -> dict:
+    """
+    Pre-formats the line-protocol tags of each configured station, e.g.
+    {"00427": ",station_id=00427,station_name=Schöneberg"}, so they are
+    escaped only once per run.
+    """
+    station_tags = {}
+    for station_id, station_name in station_map.items():
+        tags = f",station_id={_escape_key(station_id)}"
+        if station_name:
+            tags += f",station_name={_escape_key(station_name)}"
+        station_tags[station_id] = tags
+    return station_tags
+
+
+def _line_prefix(measurement, station_id, station_tags=None, tags=None) -> str:
+    """
+    Format the measurement and tag set of a line-protocol line.
+    """
+    prefix = measurement
+    for key, value in sorted((tags or {}).items()):
+        prefix += f",{_escape_key(key)}={_escape_key(value)}"
+    if station_id:
+        if station_tags and station_id in station_tags:
+            prefix += station_tags[station_id]
+        else:
+            prefix += f",station_id={_escape_key(station_id)}"
+    return prefix
 
 
 def write_points_to_influx(
-    client, bucket, org, data_list, measurement, station_map=None
+    client,
+    bucket,
+    org,
+    data,
+    measurement,
+    station_tags=None,
+    tags=None,
+    write_api=None,
 ):
     """
-    Writes data_list (list of dict) into InfluxDB 2.x using the given measurement name.
-    Each dict must contain "station_id" and "time" (if it's a time-based measurement).
-    Additional fields are put as fields in Influx.
+    Writes data into InfluxDB 2.x using the given measurement name.
+    data is a dict of parallel arrays: "station_id", "time" (datetime64, UTC)
+    and one array per field, where NaN marks a missing value. `tags` are added
+    to every point.
+
+    The records are serialized to line protocol directly and handed to
+    `write_api`, a batching write API shared by the whole job that sends them
+    in the background. Without one, a write API is opened for this call only
+    and flushed before returning.
     """
+    station_ids = data["station_id"].tolist()
+    # Epoch seconds for the whole batch in one NumPy conversion, written as
+    # plain integers instead of converting a datetime per point
+    times = data["time"].astype("datetime64[s]").astype(np.int64).tolist()
+    field_names = [k for k in data if k not in ("station_id", "time")]
+    field_keys = [_escape_key(k) for k in field_names]
+    field_columns = [data[k].tolist() for k in field_names]
+
     logger.info(
         "Writing %d points to InfluxDB for measurement '%s'",
-        len(data_list),
+        len(times),
         measurement,
     )
 
-    with client.write_api() as write_api:
-        points = []
-
-        for entry in data_list:
-            station_id = entry.pop("station_id", None)
-            tstamp = entry.pop("time", None)
-            ref_period = entry.pop("reference_period", None)
-
-            p = Point(measurement)
-            if station_id:
-                p = p.tag("station_id", station_id)
-                if (
-                    station_map
-                    and station_id in station_map
-                    and station_map[station_id]
-                ):
-                    p = p.tag("station_name", station_map[station_id])
-            if tstamp:
-                if tstamp.tzinfo is None:
-                    tstamp = tstamp.replace(tzinfo=timezone.utc)
-                p = p.time(tstamp, WritePrecision.S)
-            if ref_period:
-                p = p.tag("reference_period", ref_period)
-
-            # The rest of the keys become fields
-            for k, v in entry.items():
-                p = p.field(k, v)
-
-            points.append(p)
-
-        if points:
-            write_api.write(bucket=bucket, org=org, record=points)
-            logger.info("Successfully written %d points", len(points))
-        else:
-            logger.info("No points to write for measurement '%s'", measurement)
+    lines = []
+    # The measurement and tag part of a line is identical for all records of
+    # a station, so it is formatted only once
+    prefixes = {}
+
+    for i, (station_id, tstamp) in enumerate(zip(station_ids, times)):
+        prefix = prefixes.get(station_id)
+        if prefix is None:
+            prefix = _line_prefix(measurement, station_id, station_tags, tags)
+            prefixes[station_id] = prefix
+
+        # Missing (NaN) values are left out
+        field_set = ",".join(
+            f"{key}={_format_field_value(column[i])}"
+            for key, column in zip(field_keys, field_columns)
+            if column[i] == column[i]
+        )
+        if not field_set:
+            continue
+
+        lines.append(f"{prefix} {field_set} {tstamp}")
+
+    if not lines:
+        logger.info("No points to write for measurement '%s'", measurement)
+        return
+
+    if write_api is None:
+        with client.write_api(write_options=INFLUX_WRITE_OPTIONS) as own_write_api:
+            own_write_api.write(
+                bucket=bucket,
+                org=org,
+                record=lines,
+                write_precision=WritePrecision.S,
+            )
+        logger.info("Successfully written %d points", len(lines))
+        return
+
+    # Only queueing the lines for the background batches is serialized
+    with _influx_write_lock:
+        write_api.write(
+            bucket=bucket, org=org, record=lines, write_precision=WritePrecision.S
+        )
+    logger.info("Queued %d points for writing", len(lines))
 
 
 ###############################################################################
 # Main Logic
 ###############################################################################
-def list_dwd_files(base_url: str, prefix: str, suffix: str) -> list:
+def _index_cache_path(base_url: str, prefix: str, suffix: str) -> str:
+    """
+    Returns the path of the cache file for a filtered DWD index listing.
+    """
+    key = hashlib.sha256(f"{base_url}|{prefix}|{suffix}".encode()).hexdigest()
+    return os.path.join(INDEX_CACHE_DIR, f"{key}.json")
+
+
+def _load_index_cache(cache_path: str) -> Optional[dict]:
+    """
+    Loads a cached index listing, or returns None if there is no usable cache.
+    """
+    try:
+        with open(cache_path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable index cache %s: %s", cache_path, e)
+        return None
+
+
+def _save_index_cache(cache_path: str, cache: dict):
+    """
+    Writes an index listing to the cache. The file is replaced atomically, so
+    concurrent runs never see a partially written cache.
+    """
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning("Could not write index cache %s: %s", cache_path, e)
+
+
+@lru_cache(maxsize=None)
+def _href_pattern(prefix: str, suffix: str) -> re.Pattern:
+    """
+    Returns the compiled pattern matching href="<prefix>...<suffix>" in an
+    index page, compiled once per prefix/suffix combination.
+    """
+    return re.compile(
+        rb'href="('
+        + re.escape(prefix.encode())
+        + rb'[^"]*'
+        + re.escape(suffix.encode())
+        + rb')"'
+    )
+
+
+def list_dwd_files(
+    base_url: str, prefix: str, suffix: str, session: Optional[requests.Session] = None
+) -> list:
     """
     Parses the DWD index page at base_url and returns all filenames matching
     the given prefix and suffix.
 
+    The filtered list is cached on disk together with the ETag/Last-Modified
+    headers of the index page. Later runs send a conditional request and reuse
+    the cached list if the page has not been modified.
+
     Example:
         prefix="10minutenwerte_nieder_"
         suffix="_hist.zip"
     """
     logger.info("Listing files from DWD URL: %s", base_url)
-    html = download_file(base_url).decode("utf-8", errors="ignore")
-    soup = BeautifulSoup(html, "html.parser")
 
-    files = []
-    for link in soup.find_all("a"):
-        href = link.get("href")
-        if href and href.startswith(prefix) and href.endswith(suffix):
-            files.append(href)
+    cache_path = _index_cache_path(base_url, prefix, suffix)
+    cache = _load_index_cache(cache_path)
+    headers = {}
+    if cache:
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+    r = (session or requests).get(base_url, headers=headers, timeout=10)
+    if r.status_code == 304 and cache:
+        logger.info(
+            "DWD index %s not modified, using %d cached files",
+            base_url,
+            len(cache["files"]),
+        )
+        return cache["files"]
+
+    try:
+        r.raise_for_status()
+    except Exception as e:
+        logger.error("Error downloading %s: %s", base_url, e)
+        raise
+    html = r.content
+
+    # DWD serves a plain Apache directory listing, so matching the href
+    # attributes on the raw bytes is enough; no HTML parse tree is needed
+    href_re = _href_pattern(prefix, suffix)
+    files = [match.decode() for match in href_re.findall(html)]
 
     logger.info(
         "Found %d files matching prefix '%s' and suffix '%s'",
@@ -356,49 +637,92 @@ def list_dwd_files(base_url: str, prefix: str, suffix: str) -> list:
         suffix,
     )
 
+    if r.headers.get("ETag") or r.headers.get("Last-Modified"):
+        _save_index_cache(
+            cache_path,
+            {
+                "etag": r.headers.get("ETag"),
+                "last_modified": r.headers.get("Last-Modified"),
+                "files": files,
+            },
+        )
+
     return files
 
 
 def fetch_and_write_zip(
-    full_url, influx_client, bucket, org, data_type="precipitation", station_map=None
+    full_url,
+    influx_client,
+    bucket,
+    org,
+    parser,
+    measurement_name,
+    station_tags=None,
+    session=None,
+    write_api=None,
 ):
     """
     Fetch a zip file from the given URL, extract the text files inside,
-    parse them, and write the data to InfluxDB.
+    parse them with `parser`, and write the data to InfluxDB as
+    `measurement_name` (see DATA_TYPE_CFG). Returns True if the zip file was
+    downloaded and all its product files were parsed and queued for writing.
     """
     logger.info("Processing zip file: %s", full_url)
     try:
-        zip_content = download_file(full_url)
+        zip_file = download_to_tempfile(full_url, session)
     except Exception as e:
         logger.error("Could not download %s: %s", full_url, e)
-        return
+        return False
+
+    def parse_member(info):
+        logger.info("Processing file inside zip: %s", info.filename)
+        try:
+            with zf.open(info) as f:
+                return parser(f)
+        except (
+            ValueError,
+            pd.errors.EmptyDataError,
+            pd.errors.ParserError,
+            UnicodeDecodeError,
+            zipfile.BadZipFile,
+        ) as e:
+            logger.error(
+                "Skipping %s in %s, could not parse it: %s", info.filename, full_url, e
+            )
+            return None
+
+    # The product files are decompressed and parsed concurrently; ZipFile
+    # serializes the reads of the underlying file, and zlib releases the GIL
+    # while inflating. Other members (e.g. metadata) are ignored.
+    with zip_file, zipfile.ZipFile(zip_file) as zf:
+        infos = [
+            info
+            for info in zf.infolist()
+            if os.path.basename(info.filename).startswith("produkt_")
+            and info.filename.endswith(".txt")
+        ]
+        with ThreadPoolExecutor(max_workers=MEMBER_WORKERS) as executor:
+            parsed_members = list(executor.map(parse_member, infos))
+
+    for parsed in parsed_members:
+        if parsed is None:
+            continue
+        write_points_to_influx(
+            influx_client,
+            bucket,
+            org,
+            parsed,
+            measurement_name,
+            station_tags,
+            write_api=write_api,
+        )
+        logger.info(
+            "Wrote %d points for measurement '%s'",
+            len(parsed["time"]),
+            measurement_name,
+        )
 
-    with zipfile.ZipFile(BytesIO(zip_content)) as zf:
-        for info in zf.infolist():
-            if info.filename.endswith(".txt"):
-                logger.info("Processing file inside zip: %s", info.filename)
-                with zf.open(info) as f:
-                    text = TextIOWrapper(f, encoding="utf-8", errors="ignore").read()
-                    if data_type == "precipitation":
-                        parsed = parse_10min_precip(text)
-                        measurement_name = "precip_10min"
-                    else:
-                        parsed = parse_10min_temp(text)
-                        measurement_name = "temp_10min"
-
-                    write_points_to_influx(
-                        influx_client,
-                        bucket,
-                        org,
-                        parsed,
-                        measurement_name,
-                        station_map,
-                    )
-                    logger.info(
-                        "Wrote %d points for measurement '%s'",
-                        len(parsed),
-                        measurement_name,
-                    )
+    return None not in parsed_members
 
 
 def fetch_multi_annual_means(
@@ -406,8 +730,10 @@ def fetch_multi_annual_means(
     bucket,
     org,
     data_type="precipitation",
-    station_map=None,
+    station_tags=None,
     station_ids=None,
+    session=None,
+    write_api=None,
 ):
     """
     Download multi-annual mean data from the relevant URLs,
@@ -420,6 +746,11 @@ def fetch_multi_annual_means(
 
     measurement_name = "multi_annual_" + data_type
 
+    # Monthly values of a row, in calendar order
+    get_month_values = itemgetter(*MONTH_KEYS)
+    # Synthetic month timestamps per reference period, see below
+    period_month_starts = {}
+
     for period in PERIOD_STRINGS:
         short_period = "-".join([year[2:] for year in period.split("-")])
         url = MULTI_ANNUAL_TEMPLATES[data_type].format(
@@ -427,14 +758,17 @@ def fetch_multi_annual_means(
         )
 
         logger.info("Fetching multi-annual means from URL: %s", url)
-        content_bytes = download_file(url)
+        content_bytes = download_file(url, session)
         content_str = content_bytes.decode("utf-8", errors="ignore")
 
         # Parse the entire file
         rows = parse_multi_annual_means(content_str)
 
-        # We'll collect data points to write to Influx in one batch
-        data_points = []
+        # We'll collect data points to write to Influx in one batch per
+        # reference period, which is written as a tag:
+        #   {ref_period: (station_ids, times, values)}
+        data_points = {}
+        skipped = 0
 
         for row in rows:
             station_id = row["station_id"].zfill(5)
@@ -445,78 +779,146 @@ def fetch_multi_annual_means(
 
             ref_period = row["reference_period"]  # e.g. "1961-1990"
 
-            # We have row["Jan"], row["Feb"], ...
-            # Let's map month names to numeric offsets
-            month_values = {
-                1: row["Jan"],
-                2: row["Feb"],
-                3: row["Mar"],
-                4: row["Apr"],
-                5: row["May"],
-                6: row["Jun"],
-                7: row["Jul"],
-                8: row["Aug"],
-                9: row["Sep"],
-                10: row["Oct"],
-                11: row["Nov"],
-                12: row["Dec"],
-            }
-
-            # We'll pick a reference year from the period (e.g. the start year)
-            try:
-                start_year = int(ref_period.split("-")[0])  # e.g. 1961
-            except ValueError | TypeError:
-                logger.warning(
-                    "Skipping row with invalid reference period: %s", ref_period
-                )
-                continue
-
-            # For each month, create a separate point
-            for month_num, val in month_values.items():
-                # Synthetic time: first day of that month in the start year
-                # e.g. 1961-01-01 for January
-                # or you might prefer storing all months as day=1, year=1971, etc.
-                # The important part is that each month is a separate time value
-                synthetic_ts = datetime(start_year, month_num, 1)
-
-                # Create a single data record to transform into an Influx point
-                point_dict = {
-                    "station_id": station_id,
-                    "time": synthetic_ts,
-                    "reference_period": ref_period,
-                    "value": val,  # The monthly mean precipitation/temperature
-                }
-                data_points.append(point_dict)
+            # Synthetic times: first day of each month in the start year of the
+            # reference period, e.g. 1961-01-01 for January. The important part
+            # is that each month is a separate time value. They are built once
+            # per reference period, not per row.
+            month_starts = period_month_starts.get(ref_period)
+            if month_starts is None:
+                try:
+                    start_year = int(ref_period.split("-")[0])  # e.g. 1961
+                except (ValueError, TypeError, AttributeError):
+                    if skipped < 5:
+                        logger.debug(
+                            "Skipping row with invalid reference period: %s",
+                            ref_period,
+                        )
+                    skipped += 1
+                    continue
+                month_starts = [
+                    datetime(start_year, month, 1) for month in range(1, 13)
+                ]
+                period_month_starts[ref_period] = month_starts
+
+            # For each month, create a separate point; the value is the monthly
+            # mean precipitation/temperature
+            stations, times, values = data_points.setdefault(ref_period, ([], [], []))
+            stations.extend([station_id] * 12)
+            times.extend(month_starts)
+            values.extend(get_month_values(row))
+
+        if skipped:
+            logger.warning(
+                "Skipped %d rows with invalid reference period in %s", skipped, url
+            )
 
         # Write all data points for that reference period (and data_type)
-        write_points_to_influx(
-            influx_client, bucket, org, data_points, measurement_name, station_map
-        )
+        for ref_period, (stations, times, values) in data_points.items():
+            write_points_to_influx(
+                influx_client,
+                bucket,
+                org,
+                {
+                    "station_id": np.array(stations, dtype=object),
+                    "time": np.array(times, dtype="datetime64[s]"),
+                    "value": np.array(values, dtype=np.float64),
+                },
+                measurement_name,
+                station_tags,
+                tags={"reference_period": ref_period},
+                write_api=write_api,
+            )
         logger.info(
             "Wrote %d monthly means for reference period %s (%s)",
-            len(data_points),
+            sum(len(times) for _, times, _ in data_points.values()),
             period,
             data_type,
         )
 
 
+def query_loaded_zips(influx_client, bucket, org) -> set:
+    """
+    Returns the names of the historical zip files that were recorded as fully
+    stored by record_loaded_zips. If the query fails, an empty set is returned
+    and all zip files are fetched again.
+    """
+    query = f"""
+from(bucket: "{bucket}")
+  |> range(start: 0)
+  |> filter(fn: (r) => r._measurement == "{LOADED_ZIPS_MEASUREMENT}")
+  |> keep(columns: ["file"])
+  |> group()
+  |> distinct(column: "file")
+"""
+    try:
+        tables = influx_client.query_api().query(query, org=org)
+    except Exception as e:
+        logger.warning("Could not query the loaded historical files: %s", e)
+        return set()
+
+    return {record.get_value() for table in tables for record in table.records}
+
+
+def record_loaded_zips(influx_client, bucket, org, zipfile_names, write_api=None):
+    """
+    Records the given historical zip files as fully stored, so later runs skip
+    them. Must only be called once their data has been flushed successfully.
+    """
+    now = int(datetime.now().timestamp())
+    lines = [
+        f"{LOADED_ZIPS_MEASUREMENT},file={_escape_key(name)} loaded=1i {now}"
+        for name in zipfile_names
+    ]
+    if not lines:
+        return
+
+    if write_api is None:
+        with influx_client.write_api(
+            write_options=INFLUX_WRITE_OPTIONS
+        ) as own_write_api:
+            own_write_api.write(
+                bucket=bucket, org=org, record=lines, write_precision=WritePrecision.S
+            )
+    else:
+        with _influx_write_lock:
+            write_api.write(
+                bucket=bucket, org=org, record=lines, write_precision=WritePrecision.S
+            )
+    logger.info("Recorded %d historical files as loaded", len(lines))
+
+
 def fetch_historical_10min_data(
-    influx_client, bucket, org, station_ids, data_type="precipitation", station_map=None
+    influx_client,
+    bucket,
+    org,
+    station_ids,
+    data_type="precipitation",
+    station_tags=None,
+    session=None,
+    write_api=None,
 ):
     """
     For each station in station_ids, look up all the historical .zip files from
     the DWD directory (10minutenwerte_...). Then parse and write to Influx.
+    Files recorded as loaded in Influx are skipped; the others are downloaded
+    and processed concurrently. Their data goes through a write API of its own,
+    and only once it has been flushed without a failed batch are the files
+    recorded as loaded, so a partially written file is fetched again later.
 
     In real code, you'd list the directory contents from DWD (HTML parse or something).
     For demonstration, we show how you *would* handle a known URL or partial URL.
     """
     base_url = HISTORICAL_URLS[data_type]
+    parser, measurement_name = DATA_TYPE_CFG[data_type]
 
     prefix = f"10minutenwerte_{'nieder' if data_type == 'precipitation' else 'TU'}_"
     suffix = "_hist.zip"
-    all_filenames = list_dwd_files(base_url, prefix, suffix)
+    all_filenames = list_dwd_files(base_url, prefix, suffix, session)
+
+    loaded_zips = query_loaded_zips(influx_client, bucket, org)
 
     # For each station, filter matching files
+    zip_files = []
     for station_id in station_ids:
         padded_id = station_id.zfill(5)
         station_prefix = f"{prefix}{padded_id}_"
@@ -525,12 +927,47 @@ def fetch_historical_10min_data(
         logger.info(
             "Station %s: found %d historical files", station_id, len(station_files)
         )
+        for fn in station_files:
+            if fn in loaded_zips:
+                logger.info("Skipping %s, already in InfluxDB", fn)
+            else:
+                zip_files.append(fn)
+
+    completed_zips = []
+    failed_batches = []
+
+    def on_write_error(conf, data, exception):
+        failed_batches.append(exception)
+
+    def process_zip(zipfile_name):
+        if fetch_and_write_zip(
+            base_url + zipfile_name,
+            influx_client,
+            bucket,
+            org,
+            parser,
+            measurement_name,
+            station_tags,
+            session,
+            zip_write_api,
+        ):
+            completed_zips.append(zipfile_name)
+
+    # Closing the write API flushes the remaining batches
+    with influx_client.write_api(
+        write_options=INFLUX_WRITE_OPTIONS, error_callback=on_write_error
+    ) as zip_write_api, ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+        list(executor.map(process_zip, zip_files))
+
+    if failed_batches:
+        logger.error(
+            "%d batches failed to write, not recording %d historical files as loaded",
+            len(failed_batches),
+            len(completed_zips),
+        )
+        return
 
-        for zipfile_name in station_files:
-            full_url = base_url + zipfile_name
-            fetch_and_write_zip(
-                full_url, influx_client, bucket, org, data_type, station_map
-            )
+    record_loaded_zips(influx_client, bucket, org, completed_zips, write_api)
 
 
 def fetch_recent_or_now_10min_data(
@@ -540,7 +977,9 @@ def fetch_recent_or_now_10min_data(
     station_ids,
     data_type="precipitation",
     period="recent",
-    station_map=None,
+    station_tags=None,
+    session=None,
+    write_api=None,
 ):
     """
     Similar approach for the "recent" or "now" data from DWD.
@@ -553,12 +992,50 @@ def fetch_recent_or_now_10min_data(
     else:
         base_url = NOW_URLS[data_type]
         suffix = "_now.zip"
+    parser, measurement_name = DATA_TYPE_CFG[data_type]
 
     for station_id in station_ids:
         zipfile_name = f"10minutenwerte_{'nieder' if data_type=='precipitation' else 'TU'}_{station_id}{suffix}"
         full_url = base_url + zipfile_name
         fetch_and_write_zip(
-            full_url, influx_client, bucket, org, data_type, station_map
+            full_url,
+            influx_client,
+            bucket,
+            org,
+            parser,
+            measurement_name,
+            station_tags,
+            session,
+            write_api,
+        )
+
+
+def _run_job(influx_params, description, fetch_fn, args, kwargs):
+    """
+    Runs a single fetch job in a worker process. Each worker connects to
+    InfluxDB and DWD with its own client and HTTP session, and all writes of
+    the job go through one batching write API that is flushed when the job
+    finishes.
+    """
+    influx_url, influx_token, influx_org, influx_bucket = influx_params
+
+    logger.info("Fetching %s", description)
+
+    # One HTTP session for all downloads, so connections to DWD are reused
+    session = create_session()
+
+    # Connect to InfluxDB 2
+    with session, InfluxDBClient(
+        url=influx_url, token=influx_token, org=influx_org
+    ) as client, client.write_api(write_options=INFLUX_WRITE_OPTIONS) as write_api:
+        fetch_fn(
+            client,
+            influx_bucket,
+            influx_org,
+            *args,
+            session=session,
+            write_api=write_api,
+            **kwargs,
         )
 
 
@@ -608,88 +1085,58 @@ def main():
 
     logger.info("Configured station IDs: %s", station_ids)
 
-    # Connect to InfluxDB 2
-    with InfluxDBClient(url=influx_url, token=influx_token, org=influx_org) as client:
-        if args.mode == "init":
-            logger.info("Fetching multi-annual means for precipitation and temperature")
-            fetch_multi_annual_means(
-                client,
-                influx_bucket,
-                influx_org,
-                "precipitation",
-                station_map=station_map,
-                station_ids=station_ids,
-            )
-            fetch_multi_annual_means(
-                client,
-                influx_bucket,
-                influx_org,
-                "temperature",
-                station_map=station_map,
-                station_ids=station_ids,
-            )
-
-            logger.info("Fetching recent 10-minute data for precipitation")
-            fetch_recent_or_now_10min_data(
-                client,
-                influx_bucket,
-                influx_org,
-                station_ids,
-                "precipitation",
-                period="recent",
-                station_map=station_map,
-            )
-            logger.info("Fetching recent 10-minute data for temperature")
-            fetch_recent_or_now_10min_data(
-                client,
-                influx_bucket,
-                influx_org,
-                station_ids,
-                "temperature",
-                period="recent",
-                station_map=station_map,
-            )
-        elif args.mode == "historical":
-            logger.info("Fetching historical 10-minute data for precipitation")
-            fetch_historical_10min_data(
-                client,
-                influx_bucket,
-                influx_org,
-                station_ids,
-                "precipitation",
-                station_map=station_map,
+    # Station tags are escaped once here instead of once per written point
+    station_tags = build_station_tags(station_map)
+
+    # Each job is (description, fetch function, positional args after
+    # client/bucket/org, keyword args)
+    jobs = []
+    if args.mode == "init":
+        for data_type in ("precipitation", "temperature"):
+            jobs.append(
+                (
+                    f"multi-annual means for {data_type}",
+                    fetch_multi_annual_means,
+                    (data_type,),
+                    {"station_tags": station_tags, "station_ids": station_ids},
+                )
             )
-            logger.info("Fetching historical 10-minute data for temperature")
-            fetch_historical_10min_data(
-                client,
-                influx_bucket,
-                influx_org,
-                station_ids,
-                "temperature",
-                station_map=station_map,
+        for data_type in ("precipitation", "temperature"):
+            jobs.append(
+                (
+                    f"recent 10-minute data for {data_type}",
+                    fetch_recent_or_now_10min_data,
+                    (station_ids, data_type),
+                    {"period": "recent", "station_tags": station_tags},
+                )
             )
-        elif args.mode == "tracking":
-            logger.info("Fetching now data for precipitation")
-            fetch_recent_or_now_10min_data(
-                client,
-                influx_bucket,
-                influx_org,
-                station_ids,
-                "precipitation",
-                period="now",
-                station_map=station_map,
+    elif args.mode == "historical":
+        for data_type in ("precipitation", "temperature"):
+            jobs.append(
+                (
+                    f"historical 10-minute data for {data_type}",
+                    fetch_historical_10min_data,
+                    (station_ids, data_type),
+                    {"station_tags": station_tags},
+                )
             )
-            logger.info("Fetching now data for temperature")
-            fetch_recent_or_now_10min_data(
-                client,
-                influx_bucket,
-                influx_org,
-                station_ids,
-                "temperature",
-                period="now",
-                station_map=station_map,
+    elif args.mode == "tracking":
+        for data_type in ("precipitation", "temperature"):
+            jobs.append(
+                (
+                    f"now data for {data_type}",
+                    fetch_recent_or_now_10min_data,
+                    (station_ids, data_type),
+                    {"period": "now", "station_tags": station_tags},
+                )
             )
 
+    # The jobs share no state, so they run in separate processes to overlap
+    # downloads and parsing of the independent data streams
+    influx_params = (influx_url, influx_token, influx_org, influx_bucket)
+    with multiprocessing.Pool(min(JOB_PROCESSES, len(jobs))) as pool:
+        pool.starmap(_run_job, [(influx_params, *job) for job in jobs])
+
 
 if __name__ == "__main__":
     main()